@@ -1,7 +1,15 @@
 
+import bisect
 import curses
+import fcntl
+import functools
+import itertools
 import subprocess
 import os
+import select
+import signal
+import sys
+import tempfile
 import time
 from dataclasses import dataclass, field
 from typing import List, Optional
@@ -16,6 +24,11 @@ class AppState:
     last_search_query: str = ""
     
     raw_results: List[str] = field(default_factory=list)
+    # Lowercased raw_results joined by '\n', with the start offset of each row plus an end sentinel
+    _raw_blob: str = ""
+    _raw_starts: List[int] = field(default_factory=lambda: [0])
+    _raw_results_complete: bool = False  # True when locate returned every match (under the limit)
+    _prev_query_lower: str = ""
     filtered_results: List[str] = field(default_factory=list)
     
     scroll_pos: int = 0
@@ -29,85 +42,193 @@ class AppState:
     # Filtering
     filter_dir: str = ""
     blacklist: List[str] = field(default_factory=list)
+    blacklist_set: set = field(default_factory=set)  # mirrors blacklist for O(1) membership
+    _blacklist_tuple: tuple = ()
     undo_stack: List[str] = field(default_factory=list)
     
     # UI State
     status_message: str = ""
-    status_message_expiry: float = 0
+    status_message_expiry: float = 0  # time.monotonic() deadline
     pending_search: bool = False
     last_key_press_time: float = 0.0
     
     def set_status(self, message: str, duration: int = 2):
         """Set a temporary status message."""
-        self.status_message = message
-        self.status_message_expiry = time.time() + duration
+        self.status_message = printable(message)
+        self.status_message_expiry = time.monotonic() + duration
+
+    def refresh_blacklist_cache(self):
+        """Rebuild the prefix tuple used for blacklist matching. Call after mutating blacklist."""
+        self._blacklist_tuple = tuple(self.blacklist)
 
 # --- Core Logic ---
 
+@functools.lru_cache(maxsize=256)
+def _expand(path: str) -> str:
+    """Cached abspath(expanduser(path)); the app never changes its working directory."""
+    return os.path.abspath(os.path.expanduser(path))
+
+_dirname = functools.lru_cache(maxsize=1024)(os.path.dirname)
+
+def printable(text: str) -> str:
+    """Replaces undecodable filename bytes (surrogate escapes) so curses can draw the text."""
+    return os.fsencode(text).decode('utf-8', 'replace')
+
 def run_locate_command(query: str, limit: int) -> List[str]:
     """Executes the 'locate' command and returns the results."""
     if not query:
         return []
     command = ['locate', '-i', '-l', str(limit), query]
     try:
-        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        stdout, stderr = process.communicate()
-        if process.returncode == 0:
-            return stdout.strip().split('\n') if stdout.strip() else []
-        return [f"Error: {stderr.strip()}"]
+        # stderr goes to a temporary file: an unread stderr pipe could fill up and deadlock the stdout loop.
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr,
+                                       bufsize=1 << 16)
+            try:
+                try: # Grow the kernel pipe so large result sets need fewer read() calls (Linux only)
+                    fcntl.fcntl(process.stdout.fileno(), fcntl.F_SETPIPE_SZ, 1 << 20)
+                except (AttributeError, OSError):
+                    pass
+                # Iterate the pipe directly so the full output is never held as one string. Paths are
+                # decoded with os.fsdecode so non-UTF-8 names survive and still round-trip to the filesystem.
+                lines = [os.fsdecode(l.rstrip(b'\n')) for l in process.stdout]
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                process.stdout.close()
+                process.wait()
+            if process.returncode == 0:
+                return lines
+            stderr.seek(0)
+            return [f"Error: {os.fsdecode(stderr.read()).strip()}"]
     except FileNotFoundError:
         return ["Error: 'locate' command not found. Please ensure it's installed."]
     except Exception as e:
         return [f"An unexpected error occurred: {e}"]
 
+def _set_raw_results(state: AppState, results: List[str], lowered: List[str]):
+    state.raw_results = results
+    state._raw_blob = "\n".join(lowered)
+    state._raw_starts = list(itertools.accumulate((len(l) + 1 for l in lowered), initial=0))
+
+def update_raw_results(state: AppState):
+    """Refreshes raw_results for the current query, refining the previous results in-process when possible."""
+    query = state.last_search_query.lower()
+    prev = state._prev_query_lower
+    if (prev and state._raw_results_complete and query.startswith(prev)
+            and not any(c in query for c in '*?[\\')):
+        # Extending a plain query can only narrow a complete result set, so skip re-running locate.
+        # str.find scans the joined rows in C; Python only runs once per matching row.
+        blob, starts = state._raw_blob, state._raw_starts
+        keep = []
+        pos = blob.find(query)
+        while pos != -1 and len(keep) < state.result_limit:
+            i = bisect.bisect_right(starts, pos) - 1
+            keep.append(i)
+            pos = blob.find(query, starts[i + 1])
+        _set_raw_results(state, [state.raw_results[i] for i in keep],
+                         [blob[starts[i]:starts[i + 1] - 1] for i in keep])
+        # Hitting the limit may have dropped matches, so later refinements must go back to locate.
+        state._raw_results_complete = len(keep) < state.result_limit
+    else:
+        results = run_locate_command(state.last_search_query, state.result_limit)
+        _set_raw_results(state, results, [r.lower() for r in results])
+        # locate only prints absolute paths; anything else is an error message.
+        state._raw_results_complete = len(results) < state.result_limit and (not results or results[0].startswith('/'))
+    state._prev_query_lower = query
+
 def update_filtered_results(state: AppState):
     """Applies directory and blacklist filters to the raw results."""
-    current_results = state.raw_results
-    if state.filter_dir:
-        current_results = [r for r in current_results if r.startswith(state.filter_dir)]
-    if state.blacklist:
-        current_results = [r for r in current_results if not any(r.startswith(b) for b in state.blacklist)]
-    state.filtered_results = current_results
+    # str.startswith accepts a tuple, so the blacklist check runs in a single C-level call.
+    bl = state._blacklist_tuple
+    fd = state.filter_dir
+    if fd and bl:
+        # Test the predicate that rejects more rows first, estimated from a small sample,
+        # so most rows short-circuit after a single startswith call.
+        sample = state.raw_results[:64]
+        fd_rejects = sum(not r.startswith(fd) for r in sample)
+        bl_rejects = sum(r.startswith(bl) for r in sample)
+        if fd_rejects >= bl_rejects:
+            res = [r for r in state.raw_results if r.startswith(fd) and not r.startswith(bl)]
+        else:
+            res = [r for r in state.raw_results if not r.startswith(bl) and r.startswith(fd)]
+    elif fd:
+        res = [r for r in state.raw_results if r.startswith(fd)]
+    elif bl:
+        res = [r for r in state.raw_results if not r.startswith(bl)]
+    else:
+        # Nothing to filter: alias instead of copying. Both lists are only ever replaced, never mutated.
+        res = state.raw_results
+    state.filtered_results = res
     if state.selected_index >= len(state.filtered_results):
         state.selected_index = max(0, len(state.filtered_results) - 1)
 
 # --- UI and Interaction ---
 
+# Color pair attributes, cached by setup_colors() so drawing code avoids repeated color_pair() calls
+CP_BAR = CP_ITEM = CP_SEL = 0
+
+SEARCH_PREFIX = "Search: "
+SEARCH_PREFIX_LEN = len(SEARCH_PREFIX)
+COMMAND_PREFIX = "Command: "
+COMMAND_PREFIX_LEN = len(COMMAND_PREFIX)
+
 def setup_colors():
     """Initializes color pairs for the TUI."""
+    global CP_BAR, CP_ITEM, CP_SEL
     curses.start_color()
     curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_WHITE)
     curses.init_pair(2, curses.COLOR_CYAN, curses.COLOR_BLACK)
     curses.init_pair(3, curses.COLOR_BLACK, curses.COLOR_CYAN)
+    CP_BAR, CP_ITEM, CP_SEL = curses.color_pair(1), curses.color_pair(2), curses.color_pair(3)
 
-def draw_ui(stdscr, state: AppState):
+def draw_ui(stdscr, state: AppState, now: float):
     """Draws all UI components onto the screen."""
     height, width = stdscr.getmaxyx()
     stdscr.clear()
 
-    # Define bar_prefix early for use in drawing and cursor positioning
-    bar_prefix = "Search: " if state.input_mode == 'search' else "Command: "
+    # Pick the prefix early for use in drawing and cursor positioning
+    if state.input_mode == 'search':
+        prefix, plen = SEARCH_PREFIX, SEARCH_PREFIX_LEN
+    else:
+        prefix, plen = COMMAND_PREFIX, COMMAND_PREFIX_LEN
 
     # 1. Input Bar
-    stdscr.attron(curses.color_pair(1))
-    stdscr.addstr(0, 0, " " * (width - 1))
+    stdscr.attron(CP_BAR)
+    stdscr.hline(0, 0, ord(' ') | CP_BAR, width)
     if state.input_mode == 'select':
         display_text = f"SELECT MODE (Query: {state.last_search_query})"
         stdscr.addstr(0, 0, display_text[:width-1])
     else:
-        stdscr.addstr(0, 0, f"{bar_prefix}{state.input_buffer}")
-    stdscr.attroff(curses.color_pair(1))
+        stdscr.addstr(0, 0, prefix + state.input_buffer)
+    stdscr.attroff(CP_BAR)
 
     # 2. Results Pane
-    results_to_display = state.filtered_results[state.scroll_pos:state.scroll_pos + height - 2]
-    for i, line in enumerate(results_to_display, start=1):
-        line_display = line[:width - 1] + '…' if len(line) > width else line
-        current_index = state.scroll_pos + i - 1
-        color = curses.color_pair(3) if current_index == state.selected_index else curses.color_pair(2)
-        stdscr.addstr(i, 0, line_display, color)
+    vh = height - 2
+    end = state.scroll_pos + vh
+    view = state.filtered_results[state.scroll_pos:end]
+    w2 = width - 2
+    sel_rel = state.selected_index - state.scroll_pos
+    view = [printable(l) for l in view]
+    # Keep rows narrower than the window so a joining "\n" never follows an automatic wrap
+    trunc = [(l[:w2] + '…') if len(l) >= width else l for l in view]
+    addstr = stdscr.addstr
+    if all(l.isascii() and l.isprintable() for l in view):
+        # One addstr per color run: "\n" clears the rest of the row and moves down (scrollok is off)
+        if 0 <= sel_rel < len(trunc):
+            if sel_rel: addstr(1, 0, "\n".join(trunc[:sel_rel]), CP_ITEM)
+            addstr(1 + sel_rel, 0, trunc[sel_rel], CP_SEL)
+            if sel_rel + 1 < len(trunc): addstr(2 + sel_rel, 0, "\n".join(trunc[sel_rel + 1:]), CP_ITEM)
+        elif trunc:
+            addstr(1, 0, "\n".join(trunc), CP_ITEM)
+    else:
+        # Wide and control characters don't take exactly one column, so draw row by row
+        for i, line in enumerate(trunc):
+            addstr(i + 1, 0, line, CP_SEL if i == sel_rel else CP_ITEM)
 
     # 3. Status Bar
-    if state.status_message and time.time() < state.status_message_expiry:
+    if state.status_message and now < state.status_message_expiry:
         status_text = state.status_message
     elif state.input_mode == 'search':
         status_text = "MODE: SEARCH | Press '/' for commands or Enter to select"
@@ -116,13 +237,14 @@ def draw_ui(stdscr, state: AppState):
     else:  # 'select' mode
         status_text = "j/k: Nav | c: Copy | b: Blacklist | u: Undo | o: Open with | f: Filter | /: Cmd | Enter: Open | ESC: Search"
     
-    stdscr.addstr(height - 1, 0, " " * (width - 1))
+    stdscr.move(height - 1, 0)
+    stdscr.clrtoeol()
     stdscr.addstr(height - 1, 0, status_text[:width - 1])
 
     # 4. Cursor Position
     if state.input_mode in ['search', 'command']:
         curses.curs_set(1)
-        stdscr.move(0, len(bar_prefix) + len(state.input_buffer))
+        stdscr.move(0, plen + len(state.input_buffer))
     else:
         curses.curs_set(0)
     
@@ -130,7 +252,7 @@ def draw_ui(stdscr, state: AppState):
 
 # --- Input Handlers for different modes ---
 
-def handle_search_mode(key: int, state: AppState) -> bool:
+def handle_search_mode(key: int, state: AppState, now: float) -> bool:
     """Handles input when in SEARCH mode. Returns True if a search should be triggered."""
     buffer_modified = False
     if key in (curses.KEY_BACKSPACE, 127, 8):
@@ -152,7 +274,7 @@ def handle_search_mode(key: int, state: AppState) -> bool:
         state.selected_index = -1
         if state.result_limit > state.delay_limit:
             state.pending_search = True
-            state.last_key_press_time = time.time()
+            state.last_key_press_time = now
         else:
             return True # Trigger immediate search
     return False
@@ -175,15 +297,20 @@ def handle_select_mode(stdscr, key: int, state: AppState) -> bool:
         state.input_mode = 'command'
         state.input_buffer = "/"
     elif key == ord('b') and selected_path:
-        dir_to_blacklist = os.path.dirname(selected_path)
-        if dir_to_blacklist and dir_to_blacklist not in state.blacklist:
+        dir_to_blacklist = _dirname(selected_path)
+        if dir_to_blacklist and dir_to_blacklist not in state.blacklist_set:
             state.blacklist.append(dir_to_blacklist)
+            state.blacklist_set.add(dir_to_blacklist)
+            state.refresh_blacklist_cache()
             state.undo_stack.append(dir_to_blacklist)
             refilter_needed = True
     elif key == ord('u'):
         if state.undo_stack:
             last_blacklisted = state.undo_stack.pop()
-            if last_blacklisted in state.blacklist: state.blacklist.remove(last_blacklisted)
+            if last_blacklisted in state.blacklist_set:
+                state.blacklist_set.discard(last_blacklisted)
+                state.blacklist.remove(last_blacklisted)
+            state.refresh_blacklist_cache()
             refilter_needed = True
     elif key == ord('c') and selected_path:
         if copy_to_clipboard(selected_path):
@@ -191,7 +318,7 @@ def handle_select_mode(stdscr, key: int, state: AppState) -> bool:
         else:
             state.set_status("Error: Failed to copy. Is 'wl-clipboard' installed?")
     elif key == ord('o') and selected_path:
-        cmd_str = get_user_input(stdscr, f"Open '{os.path.basename(selected_path)}' with: ")
+        cmd_str = get_user_input(stdscr, f"Open '{printable(os.path.basename(selected_path))}' with: ")
         if cmd_str:
             try:
                 subprocess.Popen(cmd_str.split() + [selected_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -212,37 +339,55 @@ def handle_select_mode(stdscr, key: int, state: AppState) -> bool:
 
     return refilter_needed
 
+# --- Commands (dispatched from COMMAND mode) ---
+# Each handler receives the text after the command word and returns whether results
+# need refiltering, or None if the arguments don't form a known command.
+
+_SET_ATTRS = {'result': 'result_limit', 'delaylimit': 'delay_limit', 'delay': 'search_delay_ms'}
+
+def _cmd_set(state: AppState, rest: str, stdscr) -> Optional[bool]:
+    key, sep, val = rest.partition('=')
+    attr = _SET_ATTRS.get(key) if sep else None
+    if attr is None:
+        return None
+    try: setattr(state, attr, int(val))
+    except ValueError: pass
+    return False
+
+def _cmd_dir(state: AppState, rest: str, stdscr) -> Optional[bool]:
+    path = rest.strip()
+    state.filter_dir = _expand(path) if path else ""
+    return True
+
+def _cmd_black(state: AppState, rest: str, stdscr) -> Optional[bool]:
+    if rest.startswith("list"):
+        state.blacklist = blacklist_manager_view(stdscr, state.blacklist)
+        state.blacklist_set = set(state.blacklist)
+        state.refresh_blacklist_cache()
+        return True
+    if rest.startswith("add "):
+        path = rest[4:].strip()
+        if path:
+            dir_to_add = _expand(path)
+            if dir_to_add not in state.blacklist_set:
+                state.blacklist.append(dir_to_add)
+                state.blacklist_set.add(dir_to_add)
+                state.refresh_blacklist_cache()
+        return True
+    return None
+
+_CMD_DISPATCH = {'set': _cmd_set, 'dir': _cmd_dir, 'black': _cmd_black}
+
 def handle_command_mode(stdscr, key: int, state: AppState) -> tuple[bool, bool]:
     """Handles input in COMMAND mode. Returns (trigger_search, refilter_needed)."""
     trigger_search, refilter_needed = False, False
     if key in (curses.KEY_ENTER, 10, 13):
         command_str = state.input_buffer[1:] # remove leading '/'
-        is_known = True
-        
-        if command_str.startswith("set result="):
-            try: state.result_limit = int(command_str.split("=")[1])
-            except: pass
-        elif command_str.startswith("set delaylimit="):
-            try: state.delay_limit = int(command_str.split("=")[1])
-            except: pass
-        elif command_str.startswith("set delay="):
-            try: state.search_delay_ms = int(command_str.split("=")[1])
-            except: pass
-        elif command_str.startswith("dir "):
-            path = command_str[4:].strip()
-            state.filter_dir = os.path.abspath(os.path.expanduser(path)) if path else ""
-            refilter_needed = True
-        elif command_str.startswith("black list"):
-            state.blacklist = blacklist_manager_view(stdscr, state.blacklist)
-            refilter_needed = True
-        elif command_str.startswith("black add "):
-            path = command_str[10:].strip()
-            if path:
-                dir_to_add = os.path.abspath(os.path.expanduser(path))
-                if dir_to_add not in state.blacklist: state.blacklist.append(dir_to_add)
-            refilter_needed = True
-        else:
-            is_known = False
+        head, sep, rest = command_str.partition(' ')
+        handler = _CMD_DISPATCH.get(head) if sep else None
+        result = handler(state, rest, stdscr) if handler else None
+        is_known = result is not None
+        refilter_needed = bool(result)
 
         state.input_mode = 'search'
         if is_known:
@@ -279,66 +424,75 @@ def open_file(filepath: str):
 def copy_to_clipboard(text: str) -> bool:
     if not text: return False
     try:
-        p = subprocess.Popen(['wl-copy'], stdin=subprocess.PIPE, text=True)
-        p.communicate(input=text)
-        return True
+        # A single short write doesn't need communicate()'s writer thread; run_filter_command
+        # keeps communicate() since its large input could otherwise deadlock on the pipes.
+        p = subprocess.Popen(['wl-copy'], stdin=subprocess.PIPE)
+        p.stdin.write(os.fsencode(text))
+        p.stdin.close()
+        return p.wait() == 0
     except (FileNotFoundError, Exception):
         return False
 
 def get_user_input(stdscr, prompt: str) -> Optional[str]:
     curses.curs_set(1)
     input_buffer = ""
-    height, width = stdscr.getmaxyx()
     while True:
-        stdscr.attron(curses.color_pair(1))
-        stdscr.addstr(0, 0, " " * (width - 1))
+        height, width = stdscr.getmaxyx()
+        stdscr.attron(CP_BAR)
+        stdscr.hline(0, 0, ord(' ') | CP_BAR, width)
         full_prompt = f"{prompt}{input_buffer}"
         stdscr.addstr(0, 0, full_prompt[:width-1])
-        stdscr.attroff(curses.color_pair(1))
+        stdscr.attroff(CP_BAR)
         stdscr.move(0, len(full_prompt))
         stdscr.refresh()
-        key = stdscr.getch()
+        key = wait_for_key(stdscr)
         if key in (curses.KEY_ENTER, 10, 13): return input_buffer
         elif key == 27: return None
         elif key in (curses.KEY_BACKSPACE, 127, 8): input_buffer = input_buffer[:-1]
         elif 32 <= key <= 126: input_buffer += chr(key)
 
 def run_filter_command(command: str, input_data: List[str]) -> tuple[Optional[List[str]], Optional[str]]:
-    input_str = "\n".join(input_data)
+    input_bytes = os.fsencode("\n".join(input_data))
     try:
-        process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        stdout, stderr = process.communicate(input=input_str)
+        process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate(input=input_bytes)
         if process.returncode == 0:
-            return stdout.strip().split('\n') if stdout.strip() else [], None
-        return None, stderr.strip()
+            # Split on '\n' only: splitlines() also breaks on '\r', which is legal in filenames.
+            lines = stdout.split(b'\n')
+            if lines[-1] == b'': lines.pop()
+            return [os.fsdecode(l) for l in lines], None
+        return None, os.fsdecode(stderr).strip()
     except Exception as e:
         return None, str(e)
 
 def blacklist_manager_view(stdscr, blacklist: List[str]) -> List[str]:
     selected_index, scroll_pos = 0, 0
     curses.curs_set(0)
-    while True:
+
+    def redraw_row(idx: int):
+        height, width = stdscr.getmaxyx()
+        if not (0 <= idx < len(blacklist) and scroll_pos <= idx < scroll_pos + height - 3): return
+        display_item = f"{idx + 1}. {printable(blacklist[idx])}"
+        if len(display_item) > width - 2: display_item = display_item[:width - 3] + "…"
+        color = CP_SEL if idx == selected_index else curses.A_NORMAL
+        stdscr.addstr(idx - scroll_pos + 2, 1, display_item, color)
+
+    def full_redraw():
         height, width = stdscr.getmaxyx()
         stdscr.clear()
-        visible_height = height - 3
-        
         title = "Blacklist Manager"
         stdscr.addstr(0, (width - len(title)) // 2, title, curses.A_BOLD)
-        
-        items_to_display = blacklist[scroll_pos:scroll_pos + visible_height]
-        for i, item in enumerate(items_to_display):
-            current_index = scroll_pos + i
-            display_item = f"{current_index + 1}. {item}"
-            if len(display_item) > width - 2: display_item = display_item[:width - 3] + "…"
-            color = curses.color_pair(3) if current_index == selected_index else curses.A_NORMAL
-            stdscr.addstr(i + 2, 1, display_item, color)
-
+        for idx in range(scroll_pos, min(len(blacklist), scroll_pos + height - 3)):
+            redraw_row(idx)
         instructions = "j/k: Navigate | d: Delete | q: Back to Search"
-        stdscr.addstr(height - 1, 0, " " * (width - 1), curses.color_pair(1))
-        stdscr.addstr(height - 1, 1, instructions, curses.color_pair(1))
-        stdscr.refresh()
+        stdscr.hline(height - 1, 0, ord(' ') | CP_BAR, width)
+        stdscr.addstr(height - 1, 1, instructions, CP_BAR)
 
-        key = stdscr.getch()
+    full_redraw()
+    stdscr.refresh()
+    while True:
+        key = wait_for_key(stdscr)
+        old_index, old_scroll = selected_index, scroll_pos
         if key == ord('q'): break
         elif key == ord('j'):
             if blacklist: selected_index = min(len(blacklist) - 1, selected_index + 1)
@@ -348,75 +502,137 @@ def blacklist_manager_view(stdscr, blacklist: List[str]) -> List[str]:
             if blacklist and 0 <= selected_index < len(blacklist):
                 blacklist.pop(selected_index)
                 if selected_index >= len(blacklist) and blacklist: selected_index = len(blacklist) - 1
-        
+
+        visible_height = stdscr.getmaxyx()[0] - 3
         if visible_height > 0:
             if selected_index < scroll_pos: scroll_pos = selected_index
             if selected_index >= scroll_pos + visible_height: scroll_pos = selected_index - visible_height + 1
+
+        # Navigation within the visible window only recolors two rows; anything else repaints.
+        if key in (ord('j'), ord('k')) and scroll_pos == old_scroll:
+            if selected_index == old_index: continue
+            redraw_row(old_index)
+            redraw_row(selected_index)
+        elif key in (ord('j'), ord('k'), ord('d'), curses.KEY_RESIZE):
+            full_redraw()
+        else:
+            continue
+        stdscr.refresh()
     
     curses.curs_set(1)
     return blacklist
 
+# Read end of the signal wakeup pipe set up by main_loop; -1 when not installed
+_wake_fd = -1
+
+def wait_for_key(stdscr, timeout: Optional[float] = None) -> int:
+    """Blocks until a key or terminal resize arrives. Returns -1 if `timeout` seconds pass first (None waits forever).
+
+    All blocking key reads go through here: main_loop replaces ncurses' SIGWINCH handler,
+    so this is the only place a resize is applied and reported as KEY_RESIZE.
+    """
+    stdscr.nodelay(True)
+    try:
+        key = stdscr.getch()  # curses may already hold input (e.g. after an ESC sequence) that select() can't see
+        if key != -1: return key
+        fds = [sys.stdin, _wake_fd] if _wake_fd != -1 else [sys.stdin]
+        ready, _, _ = select.select(fds, [], [], timeout)
+        if _wake_fd in ready and signal.SIGWINCH in os.read(_wake_fd, 512):
+            curses.resizeterm(*os.get_terminal_size()[::-1])
+            return curses.KEY_RESIZE
+        return stdscr.getch() if ready else -1
+    finally:
+        stdscr.nodelay(False)
+
 # --- Main Application Loop ---
 
 def main_loop(stdscr):
     """The refactored main application loop."""
+    global _wake_fd
     # Initialization
-    stdscr.nodelay(True)
-    stdscr.timeout(100)
     setup_colors()
     state = AppState()
-
-    while True:
-        # 1. Check for and trigger delayed search
-        trigger_search = False
-        if state.pending_search and (time.time() - state.last_key_press_time) * 1000 >= state.search_delay_ms:
-            trigger_search = True
-            state.pending_search = False
+    dirty = True
+    # select() retries after ncurses' own SIGWINCH handler, so route the signal through a wakeup pipe instead
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    old_wakeup_fd = signal.set_wakeup_fd(wake_w)
+    old_winch = signal.signal(signal.SIGWINCH, lambda signum, frame: None)
+    _wake_fd = wake_r
+    try:
+        while True:
+            # 1. Check for and trigger delayed search
+            now = time.monotonic()
+            trigger_search = False
+            if state.pending_search and (now - state.last_key_press_time) * 1000 >= state.search_delay_ms:
+                trigger_search = True
+                state.pending_search = False
+                dirty = True
         
-        # 2. Draw the current state of the UI
-        draw_ui(stdscr, state)
+            # 2. Draw the UI only when something changed or the status message has expired
+            if state.status_message and now >= state.status_message_expiry:
+                state.status_message = ""
+                dirty = True
+            if dirty:
+                draw_ui(stdscr, state, now)
+                dirty = False
         
-        # 3. Get user input
-        try:
-            key = stdscr.getch()
-        except KeyboardInterrupt:
-            break
+            # 3. Sleep until input arrives or the next search/status deadline passes
+            deadlines = []
+            if state.pending_search: deadlines.append(state.last_key_press_time + state.search_delay_ms / 1000)
+            if state.status_message: deadlines.append(state.status_message_expiry)
+            if trigger_search: timeout = 0.0
+            elif deadlines: timeout = max(0.0, min(deadlines) - now)
+            else: timeout = None
+            try:
+                key = wait_for_key(stdscr, timeout)
+            except KeyboardInterrupt:
+                break
+            now = time.monotonic()  # the wait may have been long; key timestamps must be current for the debounce
         
-        if key == -1 and not trigger_search:
-            continue
+            if key == -1 and not trigger_search:
+                continue
             
-        # 4. Process input based on the current mode
-        refilter_needed = False
-        if state.input_mode == 'search':
-            if handle_search_mode(key, state):
-                trigger_search = True
-        elif state.input_mode == 'select':
-            if handle_select_mode(stdscr, key, state):
+            # 4. Process input based on the current mode
+            dirty = True
+            refilter_needed = False
+            if state.input_mode == 'search':
+                if handle_search_mode(key, state, now):
+                    trigger_search = True
+            elif state.input_mode == 'select':
+                if handle_select_mode(stdscr, key, state):
+                    refilter_needed = True
+            elif state.input_mode == 'command':
+                # FIX: Pass stdscr to the handler to prevent crash on 'black list'
+                search_now, filter_now = handle_command_mode(stdscr, key, state)
+                if search_now: trigger_search = True
+                if filter_now: refilter_needed = True
+
+            # 5. Update results if a search was triggered
+            if trigger_search:
+                state.scroll_pos = 0
+                update_raw_results(state)
                 refilter_needed = True
-        elif state.input_mode == 'command':
-            # FIX: Pass stdscr to the handler to prevent crash on 'black list'
-            search_now, filter_now = handle_command_mode(stdscr, key, state)
-            if search_now: trigger_search = True
-            if filter_now: refilter_needed = True
-
-        # 5. Update results if a search was triggered
-        if trigger_search:
-            state.scroll_pos = 0
-            state.raw_results = run_locate_command(state.last_search_query, state.result_limit)
-            refilter_needed = True
 
-        # 6. Apply filters if needed
-        if refilter_needed:
-            update_filtered_results(state)
+            # 6. Apply filters if needed
+            if refilter_needed:
+                update_filtered_results(state)
         
-        # 7. Update scrolling position
-        height, _ = stdscr.getmaxyx()
-        visible_height = height - 2
-        if state.selected_index != -1 and visible_height > 0:
-            if state.selected_index < state.scroll_pos:
-                state.scroll_pos = state.selected_index
-            if state.selected_index >= state.scroll_pos + visible_height:
-                state.scroll_pos = state.selected_index - visible_height + 1
+            # 7. Update scrolling position
+            height, _ = stdscr.getmaxyx()
+            visible_height = height - 2
+            if state.selected_index != -1 and visible_height > 0:
+                if state.selected_index < state.scroll_pos:
+                    state.scroll_pos = state.selected_index
+                if state.selected_index >= state.scroll_pos + visible_height:
+                    state.scroll_pos = state.selected_index - visible_height + 1
+    finally:
+        signal.signal(signal.SIGWINCH, old_winch)
+        signal.set_wakeup_fd(old_wakeup_fd)
+        _wake_fd = -1
+        os.close(wake_r)
+        os.close(wake_w)
 
 if __name__ == "__main__":
     try: